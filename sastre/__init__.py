@@ -1,12 +1,25 @@
 from .renderer import Renderer
+from .admission import AdmissionControl, RendererOverloaded
 from .scaffold import Scaffold
 from .manager import ExtensionManager
+from .cache import TemplateCache
+from .coalesce import SingleFlight
+from .farm import RenderFarm
+from .hints import AssetManifest
+from .pipeline import Pipeline, minify_html
+from .shells import ShellCache
+from .projection import ModelProjection
+from .artifacts import ArtifactStore
+from .transport import SharedMemoryTransport
 from sastre.extensions import (
     Extension, BaseExtension, Htmx, HtmxHelper, Tailwind, 
-    Alpine, React, Svelte, Lucide, Vue
+    Alpine, React, Svelte, Lucide, Vue, Mount
 )
 
 __all__ = [
-    "Renderer", "Scaffold", "ExtensionManager", "Extension", "BaseExtension", 
-    "Htmx", "HtmxHelper", "Tailwind", "Alpine", "React", "Svelte", "Lucide", "Vue"
+    "Renderer", "RendererOverloaded", "AdmissionControl", "Scaffold", "ExtensionManager",
+    "TemplateCache", "ArtifactStore", "SharedMemoryTransport", "SingleFlight", "RenderFarm",
+    "AssetManifest", "Pipeline", "minify_html", "ShellCache", "ModelProjection",
+    "Extension", "BaseExtension", 
+    "Htmx", "HtmxHelper", "Tailwind", "Alpine", "React", "Svelte", "Lucide", "Vue", "Mount"
 ]
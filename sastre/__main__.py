@@ -1,4 +1,5 @@
 import argparse
+from .cache import TemplateCache
 from .scaffold import Scaffold
 
 
@@ -6,10 +7,12 @@ def main():
     parser = argparse.ArgumentParser(description="Sastre - A simple Astro project scaffolder")
     parser.add_argument("path", nargs="?", default=".", help="Directory to create the project in (default: current directory)")
     parser.add_argument("--skip-pnpm", action="store_true", help="Skip global pnpm installation check")
+    parser.add_argument("--no-cache", action="store_true", help="Always run a full install instead of using the template cache")
+    parser.add_argument("--cache-dir", default=None, help="Template cache directory (default: $SASTRE_CACHE_DIR or ~/.cache/sastre/templates)")
     args = parser.parse_args()
     
-    scaffold = Scaffold(args.path)
-    scaffold.project(skip_pnpm_install=args.skip_pnpm)
+    scaffold = Scaffold(args.path, cache=TemplateCache(args.cache_dir))
+    scaffold.project(skip_pnpm_install=args.skip_pnpm, cache=not args.no_cache)
 
 
 if __name__ == "__main__":
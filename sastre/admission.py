@@ -0,0 +1,76 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class RendererOverloaded(RuntimeError):
+    """Raised when a render is shed because the renderer is saturated."""
+
+
+class AdmissionControl:
+    """
+    Bounds the number of in-flight renders. Extra work waits in a bounded queue until its
+    deadline; anything beyond the queue is rejected immediately instead of piling up.
+    """
+    def __init__(self, max_in_flight: Optional[int] = None, max_queue: int = 0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._queued = 0
+        self._rejected = 0
+        self._expired = 0
+        self._timeouts = 0
+
+    def _full(self) -> bool:
+        return self.max_in_flight is not None and self._in_flight >= self.max_in_flight
+
+    def acquire(self, deadline: Optional[float] = None):
+        with self._cond:
+            if not self._full():
+                self._in_flight += 1
+                return
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise RendererOverloaded(
+                    f"Renderer overloaded: {self._in_flight} in flight, {self._queued} queued")
+
+            self._queued += 1
+            try:
+                while self._full():
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        self._expired += 1
+                        raise RendererOverloaded("Render deadline expired while queued")
+                    self._cond.wait(remaining)
+                self._in_flight += 1
+            finally:
+                self._queued -= 1
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self, deadline: Optional[float] = None):
+        self.acquire(deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def timed_out(self):
+        with self._cond:
+            self._timeouts += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "in_flight": self._in_flight,
+                "queued": self._queued,
+                "rejected": self._rejected,
+                "expired": self._expired,
+                "timeouts": self._timeouts,
+            }
@@ -0,0 +1,85 @@
+import hashlib
+import os
+import shutil
+import tarfile
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+# Everything that can change the output of 'pnpm run build'
+_INPUT_DIRS = ("src", "public")
+_INPUT_FILES = ("package.json", "pnpm-lock.yaml", "astro.config.mjs", "tsconfig.json", ".sastre.json")
+
+
+class ArtifactStore:
+    """
+    A content-addressed store of built 'dist/' directories. Archives are keyed by a hash of the
+    build inputs, so any host pointing at the same (local or shared) directory can reuse a build.
+    """
+    def __init__(self, root: str):
+        self._root = Path(root).resolve()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @staticmethod
+    def _inputs(project_dir: Path) -> Iterable[Path]:
+        for name in _INPUT_FILES:
+            path = project_dir / name
+            if path.is_file():
+                yield path
+        for name in _INPUT_DIRS:
+            yield from sorted(p for p in (project_dir / name).rglob("*") if p.is_file())
+
+    def key(self, project_dir: Path) -> str:
+        digest = hashlib.sha256()
+        for path in self._inputs(project_dir):
+            digest.update(path.relative_to(project_dir).as_posix().encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(hashlib.sha256(path.read_bytes()).digest())
+        return digest.hexdigest()[:32]
+
+    def _archive(self, key: str) -> Path:
+        return self._root / f"{key}.tar.gz"
+
+    def has(self, key: str) -> bool:
+        return self._archive(key).exists()
+
+    def save(self, key: str, project_dir: Path) -> Optional[Path]:
+        dist = project_dir / "dist"
+        archive = self._archive(key)
+        if not dist.is_dir() or archive.exists():
+            return None
+
+        self._root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f"{key}-", suffix=".tmp", dir=self._root)
+        os.close(fd)
+        try:
+            with tarfile.open(tmp, "w:gz") as tar:
+                tar.add(dist, arcname="dist")
+            # Atomic on the same filesystem, so concurrent readers never see a partial archive
+            os.replace(tmp, archive)
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return archive
+
+    def restore(self, key: str, project_dir: Path) -> bool:
+        archive = self._archive(key)
+        if not archive.exists():
+            return False
+
+        staging = Path(tempfile.mkdtemp(prefix="sastre-dist-", dir=project_dir))
+        try:
+            with tarfile.open(archive, "r:gz") as tar:
+                tar.extractall(staging, filter="data")
+            dist = project_dir / "dist"
+            if dist.exists():
+                shutil.rmtree(dist)
+            os.replace(staging / "dist", dist)
+        except (OSError, tarfile.TarError):
+            return False
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return True
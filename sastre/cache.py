@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+_CACHE_IGNORE = shutil.ignore_patterns("dist", ".astro", ".git")
+_COMPLETE_MARKER = ".sastre-template"
+
+
+def _default_root() -> Path:
+    if "SASTRE_CACHE_DIR" in os.environ:
+        return Path(os.environ["SASTRE_CACHE_DIR"])
+    return Path.home() / ".cache" / "sastre" / "templates"
+
+
+def _link_or_copy(src: str, dst: str):
+    # node_modules is immutable once installed (pnpm itself hardlinks from its store)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _copy_project(source: Path, target: Path):
+    """Copies a project, hardlinking node_modules and copying everything else."""
+    target.mkdir(parents=True, exist_ok=True)
+    for item in source.iterdir():
+        if item.name == _COMPLETE_MARKER or _CACHE_IGNORE(str(source), [item.name]):
+            continue
+        destination = target / item.name
+        if item.name == "node_modules":
+            shutil.copytree(item, destination, symlinks=True, copy_function=_link_or_copy,
+                            dirs_exist_ok=True)
+        elif item.is_dir():
+            shutil.copytree(item, destination, symlinks=True, dirs_exist_ok=True)
+        else:
+            shutil.copy2(item, destination)
+
+
+class TemplateCache:
+    """
+    A local cache of fully installed projects keyed by the base package.json and the applied
+    extensions. New projects are materialized from it instead of running a full 'pnpm install'.
+    """
+    def __init__(self, root: Optional[str] = None):
+        self._root = Path(root).resolve() if root else _default_root()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @staticmethod
+    def key(package_json: dict, extensions: Iterable[str] = (), *templates: str) -> str:
+        """'extensions' are fingerprints of the extension contents, not just their names."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(package_json, sort_keys=True).encode("utf-8"))
+        digest.update(json.dumps(sorted(extensions)).encode("utf-8"))
+        for template in templates:
+            digest.update(template.encode("utf-8"))
+        return digest.hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[Path]:
+        entry = self._root / key
+        if (entry / _COMPLETE_MARKER).exists():
+            return entry
+        return None
+
+    def store(self, key: str, project_dir: Path) -> Path:
+        entry = self._root / key
+        if self.get(key):
+            return entry
+
+        self._root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f"{key}-", dir=self._root))
+        try:
+            _copy_project(project_dir, staging)
+            (staging / _COMPLETE_MARKER).write_text(key, encoding="utf-8")
+            # Another process may have populated the same key concurrently; first one wins
+            os.replace(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+        return entry
+
+    def materialize(self, key: str, project_dir: Path) -> bool:
+        entry = self.get(key)
+        if entry is None:
+            return False
+
+        _copy_project(entry, project_dir)
+        return True
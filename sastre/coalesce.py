@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+
+class Flight:
+    """
+    One shared call in progress. Its deadline is the latest among the callers waiting on it
+    (None once any of them waits without one) and grows as callers join.
+    """
+    def __init__(self, deadline: Optional[float]):
+        self._lock = threading.Lock()
+        self._deadline = deadline
+        self.future = Future()
+        # A running future can't be cancelled, so no caller can break it for the rest
+        self.future.set_running_or_notify_cancel()
+
+    @property
+    def deadline(self) -> Optional[float]:
+        with self._lock:
+            return self._deadline
+
+    def extend(self, deadline: Optional[float]):
+        with self._lock:
+            if self._deadline is not None:
+                self._deadline = None if deadline is None else max(self._deadline, deadline)
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one. The first caller starts the work
+    in its own thread, owned by no caller, and every caller that arrives while it is in flight
+    receives the same result (or exception). Nothing is kept once the call completes. Sync and
+    async callers share the same flights. Each caller waits at most until its own deadline and
+    raises TimeoutError when it runs out; giving up or being cancelled never affects the call.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Flight] = {}
+
+    def _join(self, key: str, fn: Callable[[Flight], Any], deadline: Optional[float]) -> Future:
+        with self._lock:
+            flight = self._calls.get(key)
+            if flight is not None:
+                flight.extend(deadline)
+                return flight.future
+            flight = self._calls[key] = Flight(deadline)
+        threading.Thread(target=self._run, args=(key, flight, fn), daemon=True,
+                         name=f"sastre-flight-{key[:8]}").start()
+        return flight.future
+
+    def _run(self, key: str, flight: Flight, fn: Callable[[Flight], Any]):
+        try:
+            result = fn(flight)
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+            flight.future.set_exception(e)
+        else:
+            with self._lock:
+                self._calls.pop(key, None)
+            flight.future.set_result(result)
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        return max(deadline - time.monotonic(), 0) if deadline is not None else None
+
+    def do(self, key: str, fn: Callable[[Flight], Any], deadline: Optional[float] = None) -> Any:
+        """
+        Runs fn(flight) once for all concurrent callers of 'key'. 'deadline' is a
+        time.monotonic() value; fn should stop by flight.deadline, which may grow while it runs.
+        """
+        return self._join(key, fn, deadline).result(self._remaining(deadline))
+
+    async def ado(self, key: str, fn: Callable[[Flight], Any], deadline: Optional[float] = None) -> Any:
+        future = asyncio.wrap_future(self._join(key, fn, deadline))
+        return await asyncio.wait_for(asyncio.shield(future), self._remaining(deadline))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._calls)
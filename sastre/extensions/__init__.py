@@ -6,8 +6,9 @@ from .react import React
 from .svelte import Svelte
 from .lucide import Lucide
 from .vue import Vue
+from .mount import Mount
 
 __all__ = [
     "Extension", "BaseExtension", "Htmx", "HtmxHelper", "Tailwind", 
-    "Alpine", "React", "Svelte", "Lucide", "Vue"
+    "Alpine", "React", "Svelte", "Lucide", "Vue", "Mount"
 ]
@@ -14,6 +14,7 @@ class Extension(Protocol):
 
     def dev_dependencies(self) -> Dict[str, str]: ...
 
+    # Receives a staging copy of the project, see BaseExtension.setup
     def setup(self, project_dir: Path): ...
 
     def teardown(self, project_dir: Path): ...
@@ -32,9 +33,18 @@ class BaseExtension:
     def dev_dependencies(self) -> Dict[str, str]: return {}
 
     def setup(self, project_dir: Path):
-        """Called after files are created and dependencies are updated, but before pnpm install."""
+        """
+        Called after files are created and dependencies are updated, but before pnpm install.
+        'project_dir' is a temporary staging copy of the project without node_modules or dist,
+        deleted once the transaction commits: files added, changed or deleted there are applied
+        to the real project, but don't write its path into generated files or run pnpm/npx in it.
+        """
         pass
 
     def teardown(self, project_dir: Path):
         """Called if the extension needs to clean up something (rarely used)."""
         pass
+
+    def fingerprint(self) -> str:
+        """Extra content that setup() depends on, so cached templates notice when it changes."""
+        return ""
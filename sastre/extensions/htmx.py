@@ -14,11 +14,12 @@ class HtmxHelper:
     def __init__(self, renderer: "Renderer"):
         self.renderer = renderer
 
-    def render(self, view: str, model: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> str:
+    def render(self, view: str, model: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+               context: Optional[str] = None) -> str:
         """
         Render a view using the Astro renderer.
         """
-        return self.renderer.render(view, model, headers=headers)
+        return self.renderer.render(view, model, headers=headers, context=context)
 
     @staticmethod
     def trigger(response_headers: Dict[str, str], event_name: str, detail: Any = None):
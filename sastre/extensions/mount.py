@@ -0,0 +1,115 @@
+import hashlib
+import json
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+from .base import BaseExtension
+from .alpine import Alpine
+from .react import React
+from .svelte import Svelte
+from .tailwind import Tailwind
+from .vue import Vue
+
+_NAMESPACE = re.compile(r"^[A-Za-z0-9_-]+$")
+_CONFIG_IMPORT = re.compile(r"^\s*import\s+\w+\s+from\s+['\"]([^'\"]+)['\"]", re.MULTILINE)
+# Owned by the host project, a mounted project must not change them
+_HOST_PACKAGES = {"astro", "@astrojs/node"}
+# Integrations in astro.config.mjs the built-in extensions know how to set up
+_INTEGRATIONS = {
+    "@astrojs/alpinejs": Alpine,
+    "@astrojs/react": React,
+    "@astrojs/svelte": Svelte,
+    "@astrojs/vue": Vue,
+    "@tailwindcss/vite": Tailwind,
+}
+
+
+def config_imports(project_dir: Path) -> Set[str]:
+    config_path = project_dir / "astro.config.mjs"
+    if not config_path.exists():
+        return set()
+    imports = set(_CONFIG_IMPORT.findall(config_path.read_text(encoding="utf-8")))
+    return {i for i in imports if i != "astro/config" and i not in _HOST_PACKAGES}
+
+
+class Mount(BaseExtension):
+    """
+    Mounts another Astro project under a namespace so its views are compiled into this
+    project's server build and rendered as 'namespace:view'.
+    The mounted 'src/' (without pages) is copied to 'src/mounts/<namespace>' and its 'public/'
+    files are added to the host's on every build; its package.json dependencies are merged
+    into the host project once.
+    """
+    def __init__(self, namespace: str, source: str):
+        if not _NAMESPACE.match(namespace):
+            raise ValueError(f"Invalid mount namespace: {namespace!r}")
+        self.namespace = namespace
+        self.source = Path(source).resolve()
+        if not (self.source / "src" / "views").is_dir():
+            raise FileNotFoundError(f"{self.source} has no src/views directory to mount")
+
+    def name(self) -> str:
+        return f"Mount:{self.namespace}"
+
+    def _package_json(self) -> dict:
+        package_json_path = self.source / "package.json"
+        if not package_json_path.exists():
+            return {}
+        return json.loads(package_json_path.read_text(encoding="utf-8"))
+
+    def _deps(self, section: str) -> Dict[str, str]:
+        deps = self._package_json().get(section, {})
+        return {k: v for k, v in deps.items() if k not in _HOST_PACKAGES}
+
+    def dependencies(self) -> Dict[str, str]:
+        return self._deps("dependencies")
+
+    def dev_dependencies(self) -> Dict[str, str]:
+        return self._deps("devDependencies")
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        src = self.source / "src"
+        for path in sorted(p for p in src.rglob("*") if p.is_file()):
+            relative = path.relative_to(src)
+            if relative.parts[0] == "pages":
+                continue
+            digest.update(relative.as_posix().encode("utf-8"))
+            digest.update(path.read_bytes())
+        return digest.hexdigest()
+
+    def integrations(self, project_dir: Path) -> Tuple[List[BaseExtension], List[str]]:
+        """
+        Compares the mounted project's astro.config.mjs integrations with the host's.
+        Returns the built-in extensions that set up the missing ones, and the missing
+        integrations no built-in extension covers.
+        """
+        missing = sorted(config_imports(self.source) - config_imports(project_dir))
+        known = [_INTEGRATIONS[m]() for m in missing if m in _INTEGRATIONS]
+        unknown = [m for m in missing if m not in _INTEGRATIONS]
+        return known, unknown
+
+    def setup(self, project_dir: Path):
+        self.sync(project_dir)
+
+    def sync(self, project_dir: Path):
+        target = project_dir / "src" / "mounts" / self.namespace
+        if target.exists():
+            shutil.rmtree(target)
+        shutil.copytree(self.source / "src", target, ignore=shutil.ignore_patterns("pages"))
+
+        # Static assets keep their URLs, so they go to the host's public/ as they are
+        public = self.source / "public"
+        if not public.is_dir():
+            return
+        for path in public.rglob("*"):
+            if not path.is_file():
+                continue
+            destination = project_dir / "public" / path.relative_to(public)
+            if destination.exists():
+                if destination.read_bytes() != path.read_bytes():
+                    print(f"Warning: {destination} differs from {path}; keeping the host's file.")
+                continue
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, destination)
@@ -0,0 +1,101 @@
+import bisect
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class RenderFarm:
+    """
+    Client-side view of a set of remote Astro render servers.
+    Views are routed by consistent hashing, so each view keeps hitting the same server (warm
+    module cache) and only a fraction of them move when a server joins, leaves or is ejected.
+    """
+    def __init__(self, endpoints: List[str], replicas: int = 64, check_interval: float = 5.0,
+                 eject_for: float = 30.0):
+        if not endpoints:
+            raise ValueError("A render farm needs at least one endpoint")
+        self.endpoints = [e.rstrip("/") for e in endpoints]
+        self.check_interval = check_interval
+        self.eject_for = eject_for
+        self._ring = sorted(
+            (_hash(f"{endpoint}#{i}"), endpoint) for endpoint in self.endpoints for i in range(replicas)
+        )
+        self._keys = [h for h, _ in self._ring]
+        self._ejected: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._checker: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._checker is not None
+
+    def healthy(self, endpoint: str) -> bool:
+        with self._lock:
+            until = self._ejected.get(endpoint)
+            if until is None:
+                return True
+            if time.monotonic() >= until:
+                # Give it another chance; a failure will eject it again
+                del self._ejected[endpoint]
+                return True
+            return False
+
+    def eject(self, endpoint: str):
+        with self._lock:
+            if endpoint not in self._ejected:
+                print(f"Ejecting render endpoint {endpoint}")
+            self._ejected[endpoint] = time.monotonic() + self.eject_for
+
+    def restore(self, endpoint: str):
+        with self._lock:
+            self._ejected.pop(endpoint, None)
+
+    def route(self, key: str) -> List[str]:
+        """
+        Returns every endpoint in ring order for the key: healthy ones first, so callers can
+        retry elsewhere, and ejected ones last as a final resort.
+        """
+        order = []
+        start = bisect.bisect(self._keys, _hash(key))
+        for i in range(len(self._ring)):
+            endpoint = self._ring[(start + i) % len(self._ring)][1]
+            if endpoint not in order:
+                order.append(endpoint)
+                if len(order) == len(self.endpoints):
+                    break
+        healthy = [e for e in order if self.healthy(e)]
+        return healthy + [e for e in order if e not in healthy]
+
+    def check(self):
+        for endpoint in self.endpoints:
+            try:
+                requests.get(f"{endpoint}/render", timeout=1)
+                self.restore(endpoint)
+            except requests.exceptions.RequestException:
+                self.eject(endpoint)
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            self.check()
+
+    def start(self):
+        if self._checker:
+            return
+        self.check()
+        self._stop.clear()
+        self._checker = threading.Thread(target=self._run, name="sastre-farm-health", daemon=True)
+        self._checker.start()
+
+    def stop(self):
+        if self._checker:
+            self._stop.set()
+            self._checker.join()
+            self._checker = None
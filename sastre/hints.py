@@ -0,0 +1,90 @@
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_STYLESHEET = re.compile(r'<link\b[^>]*\brel=["\']?stylesheet["\']?[^>]*>', re.IGNORECASE)
+_MODULE = re.compile(r'<script\b[^>]*\bsrc=["\']([^"\']+)["\']', re.IGNORECASE)
+_HREF = re.compile(r'\bhref=["\']([^"\']+)["\']', re.IGNORECASE)
+
+_LEARNED_FILE = "sastre-assets.json"
+_VITE_MANIFESTS = ("client/.vite/manifest.json", "server/.vite/manifest.json")
+
+
+def view_source(view: str) -> str:
+    """Maps a render view name to its source path, the same way the render page resolves it."""
+    namespace, _, name = view.rpartition(":")
+    root = f"src/mounts/{namespace}/views" if namespace else "src/views"
+    return f"{root}/{name}" if "." in name else f"{root}/{name}/index.astro"
+
+
+class AssetManifest:
+    """
+    Maps views to the built CSS and JS bundles they need, so preload Link headers (or
+    103 Early Hints) can be sent before the render even starts.
+    Entries come from the Vite build manifest when the build emits one; otherwise they are
+    learned from the first render of each view and persisted next to the build in 'dist/'.
+    """
+    def __init__(self, project_dir: Path):
+        self._dist = project_dir / "dist"
+        self._lock = threading.Lock()
+        self._views: Dict[str, List[str]] = {}
+        self._vite: Dict[str, dict] = {}
+        self.load()
+
+    def load(self):
+        with self._lock:
+            self._views = {}
+            self._vite = {}
+            for name in _VITE_MANIFESTS:
+                path = self._dist / name
+                if path.exists():
+                    self._vite.update(json.loads(path.read_text(encoding="utf-8")))
+            learned = self._dist / _LEARNED_FILE
+            if learned.exists():
+                self._views = json.loads(learned.read_text(encoding="utf-8"))
+
+    def _from_vite(self, key: str, seen: set) -> List[str]:
+        chunk = self._vite.get(key)
+        if chunk is None or key in seen:
+            return []
+        seen.add(key)
+        assets = [f"/{css}" for css in chunk.get("css", [])]
+        if chunk.get("file", "").endswith(".js"):
+            assets.append(f"/{chunk['file']}")
+        for imported in chunk.get("imports", []):
+            assets.extend(self._from_vite(imported, seen))
+        return list(dict.fromkeys(assets))
+
+    def assets(self, view: str) -> Optional[List[str]]:
+        """Returns the asset URLs of a view, or None while they are unknown."""
+        with self._lock:
+            if view in self._views:
+                return self._views[view]
+            if self._vite:
+                assets = self._from_vite(view_source(view), set())
+                if assets:
+                    return assets
+        return None
+
+    def learn(self, view: str, html: str):
+        with self._lock:
+            if view in self._views:
+                return
+        assets = [m.group(1) for tag in _STYLESHEET.findall(html) if (m := _HREF.search(tag))]
+        assets += _MODULE.findall(html)
+        assets = [a for a in dict.fromkeys(assets) if a.startswith("/_astro/")]
+        with self._lock:
+            self._views[view] = assets
+            if self._dist.is_dir():
+                (self._dist / _LEARNED_FILE).write_text(json.dumps(self._views, indent=2), encoding="utf-8")
+
+    @staticmethod
+    def link(url: str) -> str:
+        if url.endswith(".css"):
+            return f"<{url}>; rel=preload; as=style"
+        return f"<{url}>; rel=modulepreload"
+
+    def links(self, view: str) -> List[str]:
+        return [self.link(url) for url in self.assets(view) or []]
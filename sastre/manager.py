@@ -1,11 +1,18 @@
 import json
+import os
+import shutil
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 if TYPE_CHECKING:
     from sastre.extensions.base import Extension
 
+# Heavy or generated directories that setup hooks never need to see while staging
+_STAGE_IGNORE = shutil.ignore_patterns("node_modules", "dist", ".astro", ".git")
+
 
 class ExtensionManager:
     def __init__(self, project_dir: Path):
@@ -27,67 +34,206 @@ class ExtensionManager:
         state = self._get_state()
         return name in state.get("extensions", [])
 
-    def record_extension(self, name: str):
+    def installed(self) -> List[str]:
+        return list(self._get_state().get("extensions", []))
+
+    def record_extension(self, *names: str):
         state = self._get_state()
         if "extensions" not in state:
             state["extensions"] = []
-        if name not in state["extensions"]:
-            state["extensions"].append(name)
+        changed = False
+        for name in names:
+            if name not in state["extensions"]:
+                state["extensions"].append(name)
+                changed = True
+        if changed:
             self._save_state(state)
 
-    def apply(self, *extensions: "Extension"):
+    def _target(self, path: Path) -> Path:
+        return self._dir / path if not path.is_absolute() else path
+
+    def _plan(self, extensions) -> List["Extension"]:
+        installed = set(self.installed())
+        pending = []
         for extension in extensions:
-            if self.is_installed(extension.name()):
+            if extension.name() in installed:
                 continue
+            installed.add(extension.name())
+            pending.append(extension)
+        return pending
 
-            print(f"Applying extension: {extension.name()} to {self._dir}")
+    @staticmethod
+    def _merge_dependencies(package_json: dict, extensions: List["Extension"]) -> bool:
+        changed = False
+        for extension in extensions:
+            for section, deps in (("dependencies", extension.dependencies()),
+                                  ("devDependencies", extension.dev_dependencies())):
+                if not deps:
+                    continue
+                if section not in package_json:
+                    package_json[section] = {}
+                for k, v in deps.items():
+                    if package_json[section].get(k) != v:
+                        package_json[section][k] = v
+                        changed = True
+        return changed
+
+    def _stage(self, stage: Path, extensions: List["Extension"]) -> Dict[Path, Optional[str]]:
+        """
+        Runs every pending extension against a copy of the project and returns the files and
+        directories (None content) that must be created outside of it (absolute paths), so the
+        real tree is only touched on commit.
+        """
+        shutil.copytree(self._dir, stage, ignore=_STAGE_IGNORE, dirs_exist_ok=True)
+        external = {}
 
-            # Create directories
+        for extension in extensions:
+            print(f"Applying extension: {extension.name()} to {self._dir}")
             for d in extension.dirs():
-                target_dir = self._dir / d if not d.is_absolute() else d
-                target_dir.mkdir(parents=True, exist_ok=True)
-
-            # Create files
+                target = self._target(d)
+                if target.is_relative_to(self._dir):
+                    (stage / target.relative_to(self._dir)).mkdir(parents=True, exist_ok=True)
+                else:
+                    external.setdefault(target, None)
             for f, content in extension.files().items():
-                target_file = self._dir / f if not f.is_absolute() else f
-                target_file.parent.mkdir(parents=True, exist_ok=True)
-                target_file.write_text(content, encoding="utf-8")
+                target = self._target(f)
+                if target.is_relative_to(self._dir):
+                    staged = stage / target.relative_to(self._dir)
+                    staged.parent.mkdir(parents=True, exist_ok=True)
+                    staged.write_text(content, encoding="utf-8")
+                else:
+                    external[target] = content
+        return external
+
+    def _changes(self, stage: Path) -> Dict[Path, Optional[bytes]]:
+        # Directories are reported with a None payload so empty ones are created as well
+        changes = {}
+        for staged in stage.rglob("*"):
+            target = self._dir / staged.relative_to(stage)
+            if staged.is_dir():
+                if not target.exists():
+                    changes[target] = None
+                continue
+            content = staged.read_bytes()
+            if not target.exists() or target.read_bytes() != content:
+                changes[target] = content
+        return changes
+
+    def _removed(self, stage: Path) -> List[Path]:
+        """Files and directories the setup hooks deleted from the staging copy."""
+        removed = set()
+        for root, dirs, files in os.walk(self._dir):
+            ignored = _STAGE_IGNORE(root, dirs + files)
+            for name in dirs + files:
+                target = Path(root) / name
+                if name not in ignored and not os.path.lexists(stage / target.relative_to(self._dir)):
+                    removed.add(target)
+            # A removed directory goes as a whole
+            dirs[:] = [d for d in dirs if d not in ignored and Path(root) / d not in removed]
+        return sorted(removed)
+
+    def _install(self):
+        subprocess.run(["pnpm", "install"], cwd=self._dir, check=True, shell=True)
 
-            # Update package.json
-            package_json_path = self._dir / "package.json"
+    def apply(self, *extensions: "Extension"):
+        """
+        Applies all pending extensions as a single transaction: files and dependency changes are
+        planned against a staging copy, written once (in parallel) and followed by a single
+        'pnpm install'. Setup hooks run against that copy too; the files they add, change or
+        delete there are carried into the project. If anything fails the project is restored
+        and no state is recorded.
+        """
+        pending = self._plan(extensions)
+        if not pending:
+            return
+
+        with tempfile.TemporaryDirectory(prefix="sastre-") as tmp:
+            stage = Path(tmp) / "project"
+            external = self._stage(stage, pending)
+
+            # Update package.json once for every extension
+            package_json_path = stage / "package.json"
             needs_install = False
             if package_json_path.exists():
                 package_json = json.loads(package_json_path.read_text(encoding="utf-8"))
-
-                deps = extension.dependencies()
-                if deps:
-                    if "dependencies" not in package_json:
-                        package_json["dependencies"] = {}
-                    for k, v in deps.items():
-                        if package_json["dependencies"].get(k) != v:
-                            package_json["dependencies"][k] = v
-                            needs_install = True
-
-                dev_deps = extension.dev_dependencies()
-                if dev_deps:
-                    if "devDependencies" not in package_json:
-                        package_json["devDependencies"] = {}
-                    for k, v in dev_deps.items():
-                        if package_json["devDependencies"].get(k) != v:
-                            package_json["devDependencies"][k] = v
-                            needs_install = True
-
+                needs_install = self._merge_dependencies(package_json, pending)
                 if needs_install:
                     package_json_path.write_text(json.dumps(package_json, indent=2), encoding="utf-8")
 
-            # Call setup hook
-            extension.setup(self._dir)
+            # Call setup hooks against the staged project
+            for extension in pending:
+                extension.setup(stage)
+
+            changes = self._changes(stage)
+            removed = self._removed(stage)
+
+        changes.update({
+            path: content.encode("utf-8") if content is not None else None
+            for path, content in external.items()
+        })
+        backup: Dict[Path, Optional[bytes]] = {
+            path: path.read_bytes() if path.exists() else None
+            for path, content in changes.items() if content is not None
+        }
+        created = self._missing_dirs(changes)
+        # Deleted paths are moved aside rather than removed, so a rollback can bring them back
+        trash = Path(tempfile.mkdtemp(prefix=".sastre-removed-", dir=self._dir)) if removed else None
+        moved: List[Tuple[Path, Path]] = []
 
+        try:
+            self._write(changes)
+            for path in removed:
+                aside = trash / str(len(moved))
+                shutil.move(path, aside)
+                moved.append((path, aside))
             if needs_install:
-                print(f"Dependencies changed for {extension.name()}. Installing...")
-                try:
-                    subprocess.run(["pnpm", "install"], cwd=self._dir, check=True, shell=True)
-                except subprocess.CalledProcessError:
-                    print(f"Warning: 'pnpm install' failed for {extension.name()}. Please run it manually.")
-
-            self.record_extension(extension.name())
+                names = ", ".join(e.name() for e in pending)
+                print(f"Dependencies changed for {names}. Installing...")
+                self._install()
+        except (OSError, subprocess.CalledProcessError) as e:
+            print("Extension transaction failed. Restoring project files...")
+            self._restore(backup, created, moved)
+            raise RuntimeError(f"Failed to apply extensions: {e}") from e
+        finally:
+            if trash:
+                shutil.rmtree(trash, ignore_errors=True)
+
+        self.record_extension(*(e.name() for e in pending))
+
+    @staticmethod
+    def _missing_dirs(changes: Dict[Path, Optional[bytes]]) -> List[Path]:
+        """Directories that writing the changes will create, so a rollback can remove them."""
+        missing = set()
+        for path, content in changes.items():
+            directory = path if content is None else path.parent
+            while not directory.exists() and directory not in missing:
+                missing.add(directory)
+                directory = directory.parent
+        return sorted(missing, key=lambda d: len(d.parts), reverse=True)
+
+    @staticmethod
+    def _write(files: Dict[Path, Optional[bytes]]):
+        def write(item):
+            path, content = item
+            if content is None:
+                path.mkdir(parents=True, exist_ok=True)
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+
+        with ThreadPoolExecutor() as pool:
+            list(pool.map(write, files.items()))
+
+    @staticmethod
+    def _restore(backup: Dict[Path, Optional[bytes]], created: List[Path],
+                 moved: List[Tuple[Path, Path]]):
+        for path, content in backup.items():
+            if content is None:
+                path.unlink(missing_ok=True)
+            else:
+                path.write_bytes(content)
+        for path, aside in reversed(moved):
+            shutil.move(aside, path)
+        # Deepest first; none of them existed before the transaction
+        for directory in created:
+            shutil.rmtree(directory, ignore_errors=True)
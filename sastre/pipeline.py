@@ -0,0 +1,103 @@
+import fnmatch
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+Stage = Callable[[str], str]
+
+# Content of these elements is whitespace sensitive or not HTML at all (scripts, inline JSON, CSS)
+_PROTECTED = re.compile(r"(<(pre|script|textarea|style)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL)
+# Comments and tags (quoted attribute values may contain '>') are copied verbatim
+_MARKUP = re.compile(r"(<!--.*?-->|<[^\s<>\"'](?:\"[^\"]*\"|'[^']*'|[^'\">])*>)", re.DOTALL)
+# Comments that still mean something: conditional comments and the hydration anchors of
+# framework islands (Vue/Svelte '[' ']' '' markers, React '' / '$' / '/$' boundaries, Vue
+# 'v-if' placeholders, Svelte hashes)
+_KEPT_COMMENT = re.compile(r"<!--(\s*|[\[\]!$?/#]+|\[if.*|<!\[endif\]|v-[\w-]+|(?=[a-z0-9]*\d)[a-z0-9]+)-->",
+                           re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _minify_markup(text: str) -> str:
+    out, pending = [], []
+    for i, part in enumerate(_MARKUP.split(text)):
+        if i % 2 == 0:
+            pending.append(part)
+        elif not part.startswith("<!--") or _KEPT_COMMENT.fullmatch(part):
+            # Text around a dropped comment is collapsed as a single run
+            out.append(_WHITESPACE.sub(" ", "".join(pending)))
+            out.append(part)
+            pending = []
+    out.append(_WHITESPACE.sub(" ", "".join(pending)))
+    return "".join(out)
+
+
+def minify_html(html: str) -> str:
+    """
+    Removes comments and collapses whitespace runs in text to a single space, leaving tags and
+    their attributes, the content of <pre>, <script>, <textarea> and <style>, conditional
+    comments and framework hydration comments untouched. Inter-element spaces are kept as one
+    space so inline layout does not change.
+    """
+    parts = _PROTECTED.split(html)
+    out = []
+    # split() yields: text, protected block, tag name, text, protected block, tag name, ...
+    for i in range(0, len(parts), 3):
+        out.append(_minify_markup(parts[i]))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return "".join(out).strip()
+
+
+class Pipeline:
+    """
+    Post-render HTML stages applied to every render, in order. Stages can be limited to views
+    matching glob patterns; the stages applying to each view are resolved once and cached.
+    Per-stage time and size counters are exposed through Renderer.stats.
+    """
+    def __init__(self, *stages: Stage):
+        self._lock = threading.Lock()
+        self._stages: List[Tuple[str, Stage, Optional[List[str]]]] = []
+        self._views: Dict[str, List[Tuple[str, Stage]]] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        for stage in stages:
+            self.add(stage)
+
+    def add(self, stage: Stage, name: Optional[str] = None, views: Optional[Iterable[str]] = None):
+        name = name or getattr(stage, "__name__", stage.__class__.__name__)
+        with self._lock:
+            self._stages.append((name, stage, list(views) if views is not None else None))
+            self._stats[name] = {"calls": 0, "seconds": 0.0, "chars_in": 0, "chars_out": 0}
+            self._views.clear()
+
+    def stages(self, view: str) -> List[Tuple[str, Stage]]:
+        with self._lock:
+            stages = self._views.get(view)
+            if stages is None:
+                stages = [
+                    (name, stage) for name, stage, patterns in self._stages
+                    if patterns is None or any(fnmatch.fnmatch(view, p) for p in patterns)
+                ]
+                self._views[view] = stages
+            return stages
+
+    def run(self, view: str, html: str) -> str:
+        for name, stage in self.stages(view):
+            started = time.perf_counter()
+            result = stage(html)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stats = self._stats[name]
+                stats["calls"] += 1
+                stats["seconds"] += elapsed
+                stats["chars_in"] += len(html)
+                stats["chars_out"] += len(result)
+            html = result
+        return html
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def __len__(self):
+        return len(self._stages)
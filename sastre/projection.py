@@ -0,0 +1,145 @@
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from sastre.hints import view_source
+
+_FRONTMATTER = re.compile(r"^\s*---\s*\n(.*?)\n---", re.DOTALL)
+_DESTRUCTURE = re.compile(r"\b(?:const|let|var)\s*\{", re.DOTALL)
+_ASSIGNED_PROPS = re.compile(r"^\s*(?::[^=]*)?=\s*Astro\.props\b(?!\s*[.\[])")
+_ACCESS = re.compile(r"Astro\.props(?:\.(\w+)|\[\s*['\"](\w+)['\"]\s*\])")
+_PROPS_USE = re.compile(r"Astro\.props\b")
+_PROPS_TYPE = re.compile(r"\b(?:interface\s+Props\s*(extends\b[^{]*)?|type\s+Props\s*=\s*)\{")
+_MEMBER = re.compile(r"^\s*(?:readonly\s+)?['\"]?([A-Za-z_$][\w$]*)['\"]?\s*\??\s*:")
+
+
+def _strip_comments(code: str) -> str:
+    """Removes // and /* */ comments, leaving string and template literals untouched."""
+    out, i, n = [], 0, len(code)
+    while i < n:
+        char = code[i]
+        if char in "'\"`":
+            end = i + 1
+            while end < n and code[end] != char:
+                end += 2 if code[end] == "\\" else 1
+            out.append(code[i:end + 1])
+            i = end + 1
+        elif code.startswith("//", i):
+            end = code.find("\n", i)
+            i = n if end < 0 else end
+        elif code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            out.append(" ")
+            i = n if end < 0 else end + 2
+        else:
+            out.append(char)
+            i += 1
+    return "".join(out)
+
+
+def _block(text: str, start: int) -> Optional[int]:
+    """Returns the index of the brace closing the one opened right before 'start'."""
+    depth = 1
+    for i in range(start, len(text)):
+        if text[i] in "{[(":
+            depth += 1
+        elif text[i] in "}])":
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+
+def _split(body: str, separators: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    for char in body:
+        if char in "{[(":
+            depth += 1
+        elif char in "}])":
+            depth -= 1
+        if char in separators and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def props_of(source: str) -> Optional[Set[str]]:
+    """
+    Statically extracts the top-level props an .astro component reads, from destructuring of
+    Astro.props, direct accesses (Astro.props.x) and its Props interface. Returns None when
+    they can't be determined, e.g. rest spreads, passing Astro.props around as a whole or
+    Astro.props mentioned in frontmatter comments.
+    """
+    match = _FRONTMATTER.match(source)
+    raw = match.group(1) if match else ""
+    frontmatter = _strip_comments(raw)
+    # Anything the stripping got wrong must not hide a use; projection drops data, so fail closed
+    if len(_PROPS_USE.findall(frontmatter)) != len(_PROPS_USE.findall(raw)):
+        return None
+    props: Set[str] = set()
+    dynamic = False
+
+    code = frontmatter + (source[match.end():] if match else source)
+    for m in _ACCESS.finditer(code):
+        props.add(m.group(1) or m.group(2))
+    uses = len(_PROPS_USE.findall(code)) - len(_ACCESS.findall(code))
+
+    for m in _DESTRUCTURE.finditer(frontmatter):
+        end = _block(frontmatter, m.end())
+        if end is None or not _ASSIGNED_PROPS.match(frontmatter[end + 1:]):
+            continue
+        uses -= 1
+        for part in _split(frontmatter[m.end():end], ","):
+            if part.startswith("..."):
+                dynamic = True
+                continue
+            props.add(re.split(r"[:=]", part, maxsplit=1)[0].strip())
+
+    if dynamic or uses > 0:
+        return None
+
+    typed = _PROPS_TYPE.search(frontmatter)
+    if typed and not typed.group(1):
+        end = _block(frontmatter, typed.end())
+        members = _split(frontmatter[typed.end():end], ";,\n") if end is not None else []
+        names = [m.group(1) for member in members if (m := _MEMBER.match(member))]
+        # Index signatures or unparsable members mean arbitrary keys
+        if end is not None and len(names) == len(members):
+            return props | set(names)
+    return props
+
+
+class ModelProjection:
+    """
+    Per-view index of the props each view reads, built from the view sources. Used to strip
+    model keys a view never reads before they are serialized and sent to Node.
+    """
+    def __init__(self, project_dir: Path):
+        self._dir = project_dir
+        self._lock = threading.Lock()
+        self._views: Dict[str, Optional[Set[str]]] = {}
+
+    def scan(self):
+        views = {}
+        src = self._dir / "src"
+        for path in [*src.glob("views/**/*.astro"), *src.glob("mounts/*/views/**/*.astro")]:
+            key = path.relative_to(self._dir).as_posix()
+            views[key] = props_of(path.read_text(encoding="utf-8"))
+            if views[key] is None:
+                print(f"Cannot determine the props used by {key}; its models will be sent whole.")
+        with self._lock:
+            self._views = views
+
+    def props(self, view: str) -> Optional[Set[str]]:
+        with self._lock:
+            return self._views.get(view_source(view))
+
+    def project(self, view: str, model):
+        props = self.props(view)
+        if props is None or not isinstance(model, dict):
+            return model
+        return {k: v for k, v in model.items() if k in props}
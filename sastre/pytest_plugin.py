@@ -0,0 +1,127 @@
+"""
+Pytest plugin providing a session-scoped ``sastre_renderer`` fixture.
+
+The project is built and served once per test run on a free port. Under pytest-xdist the first
+worker starts the server and the others use it as remote endpoint, coordinated through a lock
+file in the run's shared temporary directory. Configure the project with ``--sastre-dir`` or the
+``sastre_dir`` ini option.
+"""
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from sastre.renderer import Renderer
+
+_STATE_FILE = "sastre-renderer.json"
+_LOCK_FILE = "sastre-renderer.lock"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("sastre")
+    group.addoption("--sastre-dir", default=None, help="Astro project served by the sastre_renderer fixture")
+    group.addoption("--sastre-no-build", action="store_true", help="Start the sastre_renderer fixture without building")
+    parser.addini("sastre_dir", "Astro project served by the sastre_renderer fixture")
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _try_lock(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _try_lock(f):
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock(f):
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _lock(path: Path, timeout: float = 600.0):
+    # OS-level locks are released when the holder dies, so a crashed worker can't wedge the rest
+    deadline = time.monotonic() + timeout
+    with open(path, "a+b") as f:
+        while True:
+            try:
+                _try_lock(f)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for {path}")
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            _unlock(f)
+
+
+def _read(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def _write(path: Path, state: dict):
+    # Atomic replace, so a reader never sees a partially written file
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.")
+    with open(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+@pytest.fixture(scope="session")
+def sastre_renderer(request, tmp_path_factory):
+    project = request.config.getoption("sastre_dir") or request.config.getini("sastre_dir")
+    if not project:
+        raise pytest.UsageError("sastre_renderer needs --sastre-dir or the sastre_dir ini option")
+    project = str(Path(request.config.rootpath, project).resolve())
+
+    # Under xdist every worker has its own basetemp inside a directory shared by the run
+    shared = tmp_path_factory.getbasetemp()
+    if "PYTEST_XDIST_WORKER" in os.environ:
+        shared = shared.parent
+    state_path, lock_path = shared / _STATE_FILE, shared / _LOCK_FILE
+
+    owner = False
+    with _lock(lock_path):
+        state = _read(state_path)
+        if not state:
+            renderer = Renderer(_dir=project, port=0, host="127.0.0.1")
+            renderer.start(build=not request.config.getoption("sastre_no_build"))
+            state = {"endpoint": renderer.url, "users": 0}
+            owner = True
+        state["users"] += 1
+        _write(state_path, state)
+
+    if not owner:
+        renderer = Renderer(_dir=project, endpoints=[state["endpoint"]])
+        renderer.start()
+
+    yield renderer
+
+    with _lock(lock_path):
+        state = _read(state_path)
+        state["users"] -= 1
+        _write(state_path, state)
+
+    if owner:
+        # Keep serving until every worker using this server is done. Checking and unlinking under
+        # one lock hold means no worker can pick up the endpoint of a server about to stop.
+        deadline = time.monotonic() + 600
+        while True:
+            with _lock(lock_path):
+                if _read(state_path).get("users", 0) <= 0 or time.monotonic() >= deadline:
+                    state_path.unlink(missing_ok=True)
+                    break
+            time.sleep(0.5)
+    renderer.stop()
@@ -1,23 +1,66 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from pathlib import Path
 import subprocess
 import requests
+import socket
+import asyncio
+import functools
+import hashlib
 import json
+import time
 import os
 
+from sastre.admission import AdmissionControl, RendererOverloaded
+from sastre.artifacts import ArtifactStore
+from sastre.coalesce import Flight, SingleFlight
+from sastre.extensions.mount import Mount
+from sastre.farm import RenderFarm
+from sastre.hints import AssetManifest
 from sastre.manager import ExtensionManager
+from sastre.pipeline import Pipeline, Stage
+from sastre.projection import ModelProjection
 from sastre.scaffold import Scaffold
+from sastre.shells import ShellCache, marker
+from sastre.transport import SharedMemoryTransport
 
 if TYPE_CHECKING:
     from sastre.extensions.base import Extension
 
 
 class Renderer:
-    def __init__(self, _dir: str, port: int = 4321, host: str = "localhost"):
-        self._dir = Path(_dir).resolve()
+    def __init__(self, _dir: Optional[str] = None, port: int = 4321, host: str = "localhost",
+                 artifacts: Optional[ArtifactStore] = None,
+                 transport: Optional[SharedMemoryTransport] = None,
+                 timeout: Optional[float] = None, max_in_flight: Optional[int] = None,
+                 max_queue: int = 0, coalesce: bool = False,
+                 endpoints: Optional[List[str]] = None, pipeline: Optional[Pipeline] = None,
+                 project_models: bool = False):
+        if _dir is None and not endpoints:
+            raise ValueError("Renderer needs a project directory or remote endpoints")
+        if endpoints and transport:
+            raise ValueError("Shared memory transport needs a local Astro server")
+        self._dir = Path(_dir).resolve() if _dir else None
         self._port = port
         self._host = host
         self._server_process = None
+        self._artifacts = artifacts
+        self._transport = transport
+        self._contexts = {}
+        self._timeout = timeout
+        self._admission = AdmissionControl(max_in_flight, max_queue)
+        self._flights = SingleFlight() if coalesce else None
+        self._mounts = {}
+        self._pipeline = pipeline if pipeline is not None else Pipeline()
+        self._shells = ShellCache()
+        # Client-only mode: render on remote servers, never scaffold, build or spawn Node
+        self._farm = RenderFarm(endpoints) if endpoints else None
+        self._manager = None
+        self._hints = AssetManifest(self._dir) if self._dir else None
+        self._projection = ModelProjection(self._dir) if self._dir and project_models else None
+        if self._projection:
+            self._projection.scan()
+        if self._farm:
+            return
 
         # Auto-scaffold if the directory doesn't exist or is missing package.json
         if not (self._dir / "package.json").exists():
@@ -26,25 +69,107 @@ class Renderer:
 
         self._manager = ExtensionManager(self._dir)
 
+    def _local(self, action: str):
+        if self._farm:
+            raise RuntimeError(f"Cannot {action} in client-only mode")
+
     def extension(self, *extensions: "Extension"):
+        self._local("apply extensions")
         self._manager.apply(*extensions)
 
     def extensions(self, *extensions: "Extension"):
         # Keep for backward compatibility
         self.extension(*extensions)
 
+    def context(self, name: str, data: dict) -> str:
+        """
+        Registers a named shared context (user, navigation, flags...) with the Astro server.
+        Renders referencing it only send their own model; the render page merges both.
+        Returns the context version, derived from its content.
+        """
+        version = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        if self._contexts.get(name, (None,))[0] == version:
+            return version
+        self._contexts[name] = (version, data)
+        if self._server_process:
+            self._register(name)
+        elif self._farm and self._farm.running:
+            for base in self._farm.endpoints:
+                self._register_remote(name, base)
+        return version
+
+    def _register(self, name: str, base: str = None):
+        version, data = self._contexts[name]
+        response = self._post({"register": {"name": name, "version": version, "data": data}}, base=base)
+        response.raise_for_status()
+
+    def _register_remote(self, name: str, base: str):
+        # Unreachable servers get the context lazily through the 409 retry in render()
+        try:
+            self._register(name, base)
+        except requests.exceptions.RequestException:
+            self._farm.eject(base)
+
+    def mount(self, namespace: str, source: str):
+        """
+        Serves the views of another Astro project from this renderer as 'namespace:view',
+        so several UIs share one build and one Node server.
+        """
+        self._local("mount projects")
+        mount = Mount(namespace, source)
+        # Integrations the mounted project relies on must exist in the shared build too
+        extensions, unknown = mount.integrations(self._dir)
+        for integration in unknown:
+            print(f"Warning: {mount.name()} uses '{integration}' in astro.config.mjs, which this "
+                  f"project lacks. Add it to {self._dir / 'astro.config.mjs'} or its views may fail.")
+        self._manager.apply(*extensions, mount)
+        mount.sync(self._dir)
+        self._mounts[namespace] = mount
+
+    def build(self):
+        self._local("build")
+        self._shells.clear()
+        Scaffold(str(self._dir)).render_page()
+        for mount in self._mounts.values():
+            mount.sync(self._dir)
+        if self._projection:
+            self._projection.scan()
+        key = self._artifacts.key(self._dir) if self._artifacts else None
+        if key and self._artifacts.restore(key, self._dir):
+            print(f"Restored build {key} from {self._artifacts.root}")
+            self._hints.load()
+            return
+
+        print(f"Building Astro project in {self._dir}...")
+        subprocess.run(["pnpm", "run", "build"], cwd=self._dir, check=True, shell=True)
+        self._hints.load()
+
+        if key:
+            self._artifacts.save(key, self._dir)
+
     def start(self, build: bool = True):
+        if self._farm:
+            self._farm.start()
+            for name in self._contexts:
+                for base in self._farm.endpoints:
+                    self._register_remote(name, base)
+            return
+
         if self._server_process:
             return
 
         if build:
-            print(f"Building Astro project in {self._dir}...")
-            subprocess.run(["pnpm", "run", "build"], cwd=self._dir, check=True, shell=True)
+            self.build()
+
+        if self._port == 0:
+            self._port = self._free_port()
 
         print(f"Starting Astro server on {self._host}:{self._port}...")
         env = dict(os.environ)
         env["PORT"] = str(self._port)
         env["HOST"] = self._host
+        if self._transport:
+            env["SASTRE_SHM_DIR"] = str(self._transport.directory)
 
         self._server_process = subprocess.Popen(
             ["pnpm", "run", "start"],
@@ -57,12 +182,13 @@ class Renderer:
         )
 
         # Wait for the server to be ready
-        import time
         max_retries = 30
         for i in range(max_retries):
             try:
                 requests.get(f"http://{self._host}:{self._port}/render", timeout=1)
                 print("Astro server is ready!")
+                for name in self._contexts:
+                    self._register(name)
                 break
             except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
                 if self._server_process.poll() is not None:
@@ -75,6 +201,8 @@ class Renderer:
             raise RuntimeError("Timed out waiting for Astro server to start")
 
     def stop(self):
+        if self._farm:
+            self._farm.stop()
         if self._server_process:
             print("Stopping renderer...")
             if os.name == 'nt':
@@ -88,6 +216,8 @@ class Renderer:
                 except subprocess.TimeoutExpired:
                     self._server_process.kill()
             self._server_process = None
+        if self._transport:
+            self._transport.close()
 
     def __aenter__(self):
         self.start()
@@ -96,14 +226,212 @@ class Renderer:
     def __aexit__(self, exc_type, exc_val, exc_tb):
         self.stop()
 
-    def render(self, view: str, model: dict, headers: dict = None) -> str:
-        payload = {"view": view, "model": model}
+    def _free_port(self) -> int:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind((self._host, 0))
+            return sock.getsockname()[1]
+
+    @property
+    def _base(self) -> str:
         # noinspection HttpUrlsUsage
-        url = f"http://{self._host}:{self._port}/render"
-        response = requests.post(url, json=payload, headers=headers)
+        return f"http://{self._host}:{self._port}"
+
+    @property
+    def url(self) -> str:
+        """Base URL of the local Astro server (port 0 picks a free one on start)."""
+        return self._base
+
+    def _post(self, payload: dict, headers: dict = None, deadline: float = None,
+              base: str = None) -> requests.Response:
+        url = f"{base or self._base}/render"
+        body = json.dumps(payload).encode("utf-8")
+        headers = {**(headers or {}), "Content-Type": "application/json"}
+
+        # requests applies the timeout per socket operation (connect, each read), not to the whole
+        # response; every attempt, including retries on other endpoints, gets only what is left
+        # of the deadline, and the render page enforces the deadline on its side.
+        timeout = None
+        if deadline is not None:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                raise requests.exceptions.Timeout("Render deadline expired")
+            # Remaining budget in milliseconds so the render page can abandon work nobody is
+            # waiting for; relative, since farm endpoints' clocks may not match this host's
+            headers["X-Sastre-Budget"] = str(max(int(timeout * 1000), 1))
+
+        handle = None
+        if self._transport and self._transport.accepts(len(body)):
+            handle = self._transport.write(body)
+            body = json.dumps({"handle": handle}).encode("utf-8")
+        try:
+            return requests.post(url, data=body, headers=headers, timeout=timeout)
+        finally:
+            if handle:
+                self._transport.release(handle)
+
+    @staticmethod
+    def _flight_key(view: str, model: dict, headers: dict, context: str, slots: dict) -> str:
+        data = json.dumps([view, model, headers, context, slots], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _deadline(self, timeout: Optional[float]) -> Optional[float]:
+        timeout = timeout if timeout is not None else self._timeout
+        return time.monotonic() + timeout if timeout is not None else None
+
+    @staticmethod
+    def _expired(view: str) -> requests.exceptions.Timeout:
+        return requests.exceptions.Timeout(f"Render deadline expired waiting for {view}")
+
+    def render(self, view: str, model: dict, headers: dict = None, context: str = None,
+               timeout: float = None, slots: Dict[str, str] = None) -> str:
+        return self._render_until(view, model, headers, context, self._deadline(timeout), slots)
+
+    def _render_until(self, view: str, model: dict, headers: dict, context: str,
+                      deadline: Optional[float], slots: Dict[str, str] = None) -> str:
+        try:
+            if self._flights is None:
+                return self._render(view, model, headers, context, deadline, slots)
+            key = self._flight_key(view, model, headers, context, slots)
+            call = functools.partial(self._shared, view, model, headers, context, slots)
+            try:
+                return self._flights.do(key, call, deadline)
+            except TimeoutError:
+                raise self._expired(view) from None
+        except requests.exceptions.Timeout:
+            self._admission.timed_out()
+            raise
+
+    async def arender(self, view: str, model: dict, headers: dict = None, context: str = None,
+                      timeout: float = None, slots: Dict[str, str] = None) -> str:
+        """
+        Async variant of render(): the blocking request runs in a worker thread. With coalescing
+        enabled, identical sync and async renders in flight share a single Node call.
+        """
+        deadline = self._deadline(timeout)
+        try:
+            if self._flights is None:
+                return await asyncio.to_thread(self._render, view, model, headers, context,
+                                               deadline, slots)
+            key = self._flight_key(view, model, headers, context, slots)
+            call = functools.partial(self._shared, view, model, headers, context, slots)
+            try:
+                return await self._flights.ado(key, call, deadline)
+            except TimeoutError:
+                raise self._expired(view) from None
+        except requests.exceptions.Timeout:
+            self._admission.timed_out()
+            raise
+
+    def _shared(self, view: str, model: dict, headers: dict, context: str,
+                slots: Optional[Dict[str, str]], flight: Flight) -> str:
+        # The shared call runs until the latest deadline among its callers, so when a caller with
+        # more time joins after the call started it is retried for them instead of failing early
+        while True:
+            deadline = flight.deadline
+            try:
+                return self._render(view, model, headers, context, deadline, slots)
+            except (requests.exceptions.Timeout, RendererOverloaded):
+                if flight.deadline == deadline:
+                    raise
+
+    def page(self, layout: str, view: str, model: dict, layout_model: dict = None,
+             slots: Dict[str, Tuple[str, dict]] = None, headers: dict = None,
+             context: str = None, timeout: float = None) -> str:
+        """
+        Renders a full page from a cached layout shell. The layout is rendered once per build,
+        layout model and context version with markers in its slots; each call only renders the
+        view (into the default slot) and any extra (view, model) slots, then splices them in.
+        The layout model must not vary per request, only slot contents do. The shell is shared
+        across requests, so it is rendered without 'headers'; only the slot views receive them.
+        'timeout' bounds the whole call, shell and slots included.
+        """
+        deadline = self._deadline(timeout)
+        parts = {"default": (view, model), **(slots or {})}
+        version = self._contexts[context][0] if context in self._contexts else None
+        key = self._shells.key(layout, layout_model or {}, parts, context, version)
+
+        shell = self._shells.get(key)
+        if shell is None:
+            holes = {slot: marker(slot) for slot in parts}
+            shell = self._render_until(layout, layout_model or {}, None, context, deadline, holes)
+            self._shells.put(key, shell)
+
+        rendered = {
+            slot: self._render_until(part_view, part_model, headers, context, deadline)
+            for slot, (part_view, part_model) in parts.items()
+        }
+        return self._shells.splice(shell, rendered)
+
+    def _render(self, view: str, model: dict, headers: dict = None, context: str = None,
+                deadline: float = None, slots: Dict[str, str] = None) -> str:
+        if self._projection:
+            model = self._projection.project(view, model)
+        payload = {"view": view, "model": model}
+        if slots:
+            payload["slots"] = slots
+        if context:
+            if context not in self._contexts:
+                raise KeyError(f"Unknown context: {context}")
+            payload["context"] = {"name": context, "version": self._contexts[context][0]}
+
+        bases = self._farm.route(view) if self._farm else [self._base]
+        with self._admission.slot(deadline):
+            response = self._send(bases, payload, headers, deadline, context)
+        if response.status_code == 504:
+            # The render page abandoned work past its deadline
+            raise requests.exceptions.Timeout(f"Render deadline expired for {view}", response=response)
         response.raise_for_status()
+        if self._hints:
+            self._hints.learn(view, response.text)
+        if self._pipeline:
+            return self._pipeline.run(view, response.text)
         return response.text
 
+    def stage(self, stage: Stage, name: str = None, views: List[str] = None):
+        """
+        Adds a post-render stage (html -> html), optionally only for views matching the given
+        glob patterns. Stages run in the order they are added, e.g. renderer.stage(minify_html).
+        """
+        self._pipeline.add(stage, name=name, views=views)
+
+    def preload(self, view: str) -> dict:
+        """
+        Returns a 'Link' header preloading the CSS and JS bundles of a view, to send before
+        rendering (e.g. as 103 Early Hints or on the final response). Empty while unknown.
+        """
+        links = self._hints.links(view) if self._hints else []
+        return {"Link": ", ".join(links)} if links else {}
+
+    def _send(self, bases: List[str], payload: dict, headers: dict, deadline: float,
+              context: str) -> requests.Response:
+        # Renders are idempotent, so unreachable or unavailable servers are retried elsewhere
+        for i, base in enumerate(bases):
+            last = i == len(bases) - 1
+            try:
+                response = self._post(payload, headers, deadline, base)
+                if response.status_code == 409 and context:
+                    # The server lost or never saw this context version (e.g. after a restart)
+                    self._register(context, base)
+                    response = self._post(payload, headers, deadline, base)
+            except requests.exceptions.ConnectionError:
+                if self._farm:
+                    self._farm.eject(base)
+                if last:
+                    raise
+                continue
+            if response.status_code in (502, 503) and not last:
+                self._farm.eject(base)
+                continue
+            return response
+
+    @property
+    def stats(self) -> dict:
+        """
+        Admission counters (in-flight and queued renders, rejections, expirations and timeouts)
+        plus per-stage pipeline timings under 'stages'.
+        """
+        return {**self._admission.stats(), "stages": self._pipeline.stats()}
+
     @property
     def assets(self):
         return self._dir / "public"
@@ -2,6 +2,13 @@ import os
 import subprocess
 import json
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from sastre.cache import TemplateCache
+from sastre.manager import ExtensionManager
+
+if TYPE_CHECKING:
+    from sastre.extensions.base import Extension
 
 _ASTRO_BASE_PACKAGE = {
     "name": "astro-renderer",
@@ -78,6 +85,14 @@ button {
 """
 
 _RENDER_PAGE = """---
+import fs from 'node:fs';
+import path from 'node:path';
+
+// Python sends the time it has left rather than a point in time, so clocks need not agree
+const budget = Number(Astro.request.headers.get('x-sastre-budget') ?? 0);
+const deadline = budget > 0 ? Date.now() + budget : 0;
+const expired = () => deadline > 0 && Date.now() > deadline;
+
 let payload = {};
 
 if (Astro.request.method === 'POST') {
@@ -88,15 +103,51 @@ if (Astro.request.method === 'POST') {
   payload = await Astro.request.json();
 }
 
-const { view, model } = payload;
+// Python has stopped waiting by now, so expired work is abandoned
+if (expired()) {
+  return new Response('Render deadline expired', { status: 504 });
+}
+
+// Large payloads are handed over through a shared memory file instead of the request body
+if (payload.handle) {
+  const shmDir = process.env.SASTRE_SHM_DIR;
+  if (!shmDir || payload.handle !== path.basename(payload.handle)) {
+    throw new Error('Invalid model handle');
+  }
+  payload = JSON.parse(fs.readFileSync(path.join(shmDir, payload.handle), 'utf-8'));
+}
+
+// Shared contexts are registered once and live for the whole server process
+const contexts = (globalThis.__sastreContexts ??= new Map());
+
+if (payload.register) {
+  const { name, version, data } = payload.register;
+  contexts.set(name, { version, data });
+  return new Response(null, { status: 204 });
+}
+
+let context = {};
+if (payload.context) {
+  const entry = contexts.get(payload.context.name);
+  if (!entry || entry.version !== payload.context.version) {
+    return new Response(`Unknown context: ${payload.context.name}@${payload.context.version}`, { status: 409 });
+  }
+  context = entry.data;
+}
+
+const { view, model, slots = {} } = payload;
 
 if (!view) {
   throw new Error('Missing "view" in the JSON body');
 }
 
-const viewModules = import.meta.glob('../views/**/*.astro');
+const viewModules = import.meta.glob(['../views/**/*.astro', '../mounts/*/views/**/*.astro']);
 
-const viewKey = view.includes('.') ? `../views/${view}` : `../views/${view}/index.astro`;
+// 'admin:users/list' resolves inside the project mounted under the 'admin' namespace
+const separator = view.indexOf(':');
+const viewRoot = separator >= 0 ? `../mounts/${view.slice(0, separator)}/views` : '../views';
+const viewName = separator >= 0 ? view.slice(separator + 1) : view;
+const viewKey = viewName.includes('.') ? `${viewRoot}/${viewName}` : `${viewRoot}/${viewName}/index.astro`;
 const loadView = viewModules[viewKey];
 
 if (!loadView) {
@@ -105,6 +156,10 @@ if (!loadView) {
 
 const Page = (await loadView()).default;
 
+if (expired()) {
+  return new Response('Render deadline expired', { status: 504 });
+}
+
 let props = {};
 if (model && typeof model === 'object') props = model;
 if (typeof model === 'string') {
@@ -114,15 +169,19 @@ if (typeof model === 'string') {
     throw new Error('The model field must be a valid JSON string or an object');
   }
 }
+props = { ...context, ...props };
 ---
 
-<Page {...props} />
+<Page {...props}>
+  {Object.entries(slots).map(([name, html]) => <Fragment slot={name} set:html={html} />)}
+</Page>
 """
 
 
 class Scaffold:
-    def __init__(self, _dir: str):
+    def __init__(self, _dir: str, cache: Optional[TemplateCache] = None):
         self._path = Path(_dir).resolve()
+        self._cache = cache if cache is not None else TemplateCache()
 
     def dirs(self):
         dirs = [
@@ -149,6 +208,18 @@ class Scaffold:
         for file_path, content in files.items():
             file_path.write_text(content, encoding="utf-8")
 
+    def render_page(self) -> bool:
+        """
+        Writes the Sastre-managed render page if it is missing or outdated.
+        Returns True when the file changed.
+        """
+        page = self._path / "src" / "pages" / "render.astro"
+        if page.exists() and page.read_text(encoding="utf-8") == _RENDER_PAGE:
+            return False
+        page.parent.mkdir(parents=True, exist_ok=True)
+        page.write_text(_RENDER_PAGE, encoding="utf-8")
+        return True
+
     def install(self, skip_pnpm_install: bool = False):
         if not skip_pnpm_install:
             try:
@@ -158,13 +229,39 @@ class Scaffold:
                 subprocess.run(["npm", "install", "-g", "pnpm"], cwd=self._path, check=True, shell=True)
 
         print("Installing base dependencies...")
-        subprocess.run(["pnpm", "install"], cwd=self._path, check=True, shell=True)
+        # Prefer packages already in the pnpm store, only hitting the network for missing ones
+        subprocess.run(["pnpm", "install", "--prefer-offline"], cwd=self._path, check=True, shell=True)
         os.makedirs(self._path / "dist" / "client", exist_ok=True) # pre-patch for statics mounts
 
-    def project(self, skip_pnpm_install: bool = False):
+    @staticmethod
+    def _fingerprint(extension: "Extension") -> str:
+        files = {Path(f).as_posix(): content for f, content in extension.files().items()}
+        fingerprint = getattr(extension, "fingerprint", lambda: "")()
+        return json.dumps([
+            extension.name(), extension.dependencies(), extension.dev_dependencies(), files, fingerprint
+        ], sort_keys=True)
+
+    def template_key(self, *extensions: "Extension") -> str:
+        return TemplateCache.key(
+            _ASTRO_BASE_PACKAGE, [self._fingerprint(e) for e in extensions], ASTRO_CONFIG, _RENDER_PAGE
+        )
+
+    def project(self, skip_pnpm_install: bool = False, extensions: Sequence["Extension"] = (),
+                cache: bool = True):
+        key = self.template_key(*extensions)
+        if cache and self._cache.materialize(key, self._path):
+            os.makedirs(self._path / "dist" / "client", exist_ok=True)
+            print(f"🚀 Astro project created in {self._path} from cached template {key}")
+            print("😎 Base project is ready!")
+            return
+
         self.dirs()
         self.files()
         print(f"🚀 Astro project created in {self._path}")
         self.install(skip_pnpm_install=skip_pnpm_install)
+        if extensions:
+            ExtensionManager(self._path).apply(*extensions)
+        if cache:
+            self._cache.store(key, self._path)
         # We don't build here, let the Renderer handle it or user handle it
         print("😎 Base project is ready!")
@@ -0,0 +1,54 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+
+def marker(slot: str) -> str:
+    # An element rather than a comment, so post-render stages like minify_html keep it
+    return f'<sastre-slot name="{slot}"></sastre-slot>'
+
+
+class ShellCache:
+    """
+    Rendered layout shells with a marker in each named slot. A shell is rendered once per
+    build, layout model and context version; page renders only fill in its holes.
+    """
+    def __init__(self, size: int = 128):
+        self.size = size
+        self._lock = threading.Lock()
+        self._shells: "OrderedDict[str, str]" = OrderedDict()
+
+    @staticmethod
+    def key(layout: str, model: dict, slots: Iterable[str], context: Optional[str],
+            version: Optional[str]) -> str:
+        data = json.dumps([layout, model, sorted(slots), context, version], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            shell = self._shells.get(key)
+            if shell is not None:
+                self._shells.move_to_end(key)
+            return shell
+
+    def put(self, key: str, shell: str):
+        with self._lock:
+            self._shells[key] = shell
+            self._shells.move_to_end(key)
+            while len(self._shells) > self.size:
+                self._shells.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._shells.clear()
+
+    @staticmethod
+    def splice(shell: str, parts: Dict[str, str]) -> str:
+        for slot, html in parts.items():
+            hole = marker(slot)
+            if hole not in shell:
+                raise ValueError(f"Layout shell has no slot named {slot!r}")
+            shell = shell.replace(hole, html, 1)
+        return shell